@@ -2,35 +2,43 @@
 Configuration management for the Bridge Server
 """
 import os
-from typing import Optional
+from dataclasses import dataclass, field
+from functools import lru_cache
 
 
+@dataclass(frozen=True, slots=True)
 class Config:
     """Configuration class for Bridge Server settings"""
-    
-    def __init__(self):
-        # Serial port configuration
-        self.serial_port: str = os.getenv("SERIAL_PORT", "COM9")
-        self.baudrate: int = int(os.getenv("BAUDRATE", "9600"))
-        self.serial_timeout: float = float(os.getenv("SERIAL_TIMEOUT", "1.0"))
-        
-        # WebSocket configuration
-        self.ws_host: str = os.getenv("WS_HOST", "0.0.0.0")
-        self.ws_port: int = int(os.getenv("WS_PORT", "8000"))
-        
-        # Reconnection settings
-        self.reconnect_interval: int = int(os.getenv("RECONNECT_INTERVAL", "5"))
-        
-        # Limits
-        self.max_ws_connections: int = int(os.getenv("MAX_WS_CONNECTIONS", "100"))
-        
-    def update_from_args(self, port: Optional[str] = None, baudrate: Optional[int] = None):
-        """Update configuration from command line arguments"""
-        if port:
-            self.serial_port = port
-        if baudrate:
-            self.baudrate = baudrate
+
+    # Serial port configuration
+    serial_port: str = field(default_factory=lambda: os.getenv("SERIAL_PORT", "COM9"))
+    baudrate: int = field(default_factory=lambda: int(os.getenv("BAUDRATE", "9600")))
+    serial_timeout: float = field(default_factory=lambda: float(os.getenv("SERIAL_TIMEOUT", "1.0")))
+    serial_poll_interval: float = field(default_factory=lambda: float(os.getenv("SERIAL_POLL_INTERVAL", "0.01")))
+    serial_write_timeout: float = field(default_factory=lambda: float(os.getenv("SERIAL_WRITE_TIMEOUT", "1.0")))
+
+    # WebSocket configuration
+    ws_host: str = field(default_factory=lambda: os.getenv("WS_HOST", "0.0.0.0"))
+    ws_port: int = field(default_factory=lambda: int(os.getenv("WS_PORT", "8000")))
+
+    # Reconnection settings
+    reconnect_interval: int = field(default_factory=lambda: int(os.getenv("RECONNECT_INTERVAL", "5")))
+    max_reconnect_interval: float = field(default_factory=lambda: float(os.getenv("MAX_RECONNECT_INTERVAL", "60")))
+
+    # Limits
+    max_ws_connections: int = field(default_factory=lambda: int(os.getenv("MAX_WS_CONNECTIONS", "100")))
+
+
+@lru_cache(maxsize=1)
+def get_config() -> Config:
+    """
+    Build the configuration from environment variables
+
+    The environment is read only once; later calls return the same instance.
+    Use dataclasses.replace() to derive a copy with overridden values.
+    """
+    return Config()
 
 
 # Global configuration instance
-config = Config()
+config = get_config()
@@ -0,0 +1,20 @@
+"""
+JSON Codec Module
+Shared JSON encoding for outbound messages, using orjson when it is installed
+"""
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+if orjson is not None:
+    # orjson returns UTF-8 bytes directly
+    dumps = orjson.dumps
+else:
+    def dumps(obj: Any) -> bytes:
+        """Serialize an object to UTF-8 encoded JSON bytes"""
+        return json.dumps(obj).encode('utf-8')
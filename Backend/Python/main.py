@@ -4,14 +4,17 @@ Connects Arduino serial communication with WebSocket clients
 """
 import asyncio
 import logging
-import json
 from contextlib import asynccontextmanager
+from dataclasses import replace
+from typing import Any
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
+import msgspec
 import argparse
 
 from config import config
+from json_codec import dumps
 from websocket_manager import WebSocketManager
 from serial_handler import SerialHandler
 
@@ -22,13 +25,41 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Pre-encoded replies for fixed-shape control messages
+PONG_MESSAGE = b'{"type":"pong"}'
+TOPIC_REQUIRED_MESSAGE = b'{"type":"error","message":"Topic is required"}'
+INVALID_JSON_MESSAGE = b'{"type":"error","message":"Invalid JSON format"}'
+INVALID_MESSAGE_MESSAGE = b'{"type":"error","message":"Invalid message format"}'
+INTERNAL_ERROR_MESSAGE = b'{"type":"error","message":"Internal server error"}'
+
+
+def encode_ack(success: bool, topic: str) -> bytes:
+    """
+    Encode a publish acknowledgment without building a dict
+    
+    Args:
+        success: Whether the message was written to the serial port
+        topic: Topic from the client (JSON-escaped, as it is user-controlled)
+        
+    Returns:
+        UTF-8 encoded JSON ack message
+    """
+    return b'{"type":"ack","success":%s,"topic":%s}' % (
+        b'true' if success else b'false',
+        dumps(topic)
+    )
+
+
 # Global instances
 ws_manager = WebSocketManager(max_connections=config.max_ws_connections)
 serial_handler = SerialHandler(
     port=config.serial_port,
     baudrate=config.baudrate,
     timeout=config.serial_timeout,
-    reconnect_interval=config.reconnect_interval
+    reconnect_interval=config.reconnect_interval,
+    max_reconnect_interval=config.max_reconnect_interval,
+    poll_interval=config.serial_poll_interval,
+    write_timeout=config.serial_write_timeout
 )
 
 
@@ -38,38 +69,47 @@ async def serial_to_websocket_task():
     """
     logger.info("Starting serial-to-websocket routing task")
     
+    # Bind hot-path methods once outside the loop
+    wait_until_connected = serial_handler.wait_until_connected
+    read_message = serial_handler.read_message
+    try_parse_buffered = serial_handler.try_parse_buffered
+    broadcast_batch = ws_manager.broadcast_batch
+    
     while True:
         try:
-            if serial_handler.is_connected:
-                # Read message from serial port
-                message = await serial_handler.read_message()
+            # Suspend until the serial port is connected
+            await wait_until_connected()
+            
+            # Suspend until a complete message arrives from the serial port,
+            # then drain any further lines that arrived in the same burst
+            message = await read_message()
+            batch = []
+            while message is not None:
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Routing message from Arduino: %s", message['topic'])
                 
-                if message:
-                    logger.debug(f"Routing message from Arduino: {message['topic']}")
-                    
-                    # Broadcast to all WebSocket clients
-                    await ws_manager.broadcast({
-                        'type': 'message',
-                        'topic': message['topic'],
-                        'payload': message['payload'],
-                        'source': 'arduino'
-                    })
-                else:
-                    # No message available, small delay
-                    await asyncio.sleep(0.01)
-            else:
-                # Wait a bit if not connected
-                await asyncio.sleep(0.5)
+                batch.append({
+                    'type': 'message',
+                    'topic': message['topic'],
+                    'payload': message['payload'],
+                    'source': 'arduino'
+                })
+                message = try_parse_buffered()
+            
+            # Broadcast to all WebSocket clients
+            await broadcast_batch(batch)
         
         except asyncio.CancelledError:
             logger.info("Serial-to-websocket task cancelled")
             break
+        except ConnectionError:
+            # Serial handler already handled the disconnection; wait for reconnect
+            continue
         except Exception as e:
             logger.error(f"Error in serial-to-websocket task: {e}", exc_info=True)
             
-            # Handle disconnection
-            if serial_handler.is_connected:
-                await serial_handler.handle_disconnect()
+            # Handle disconnection (no-op if already disconnected)
+            await serial_handler.handle_disconnect()
             
             await asyncio.sleep(1)
 
@@ -228,6 +268,47 @@ async def publish_message(request: PublishRequest):
     }
 
 
+class ClientMessage(msgspec.Struct):
+    """Message received from a WebSocket client"""
+    type: str = 'publish'
+    topic: str = ''
+    payload: Any = ''
+
+
+client_message_decoder = msgspec.json.Decoder(ClientMessage)
+
+
+async def handle_publish(message: ClientMessage, websocket: WebSocket, client_id: int):
+    """Forward a client's publish message to Arduino via serial"""
+    topic = message.topic
+    
+    if not topic:
+        logger.warning(f"Client {client_id} sent message without topic")
+        ws_manager.send_bytes_personal(TOPIC_REQUIRED_MESSAGE, websocket)
+        return
+    
+    logger.debug("Client %s publishing: %s:%s", client_id, topic, message.payload)
+    success = await serial_handler.write_message(topic, message.payload)
+    
+    if not success:
+        logger.warning(f"Failed to write message from client {client_id}")
+    
+    # Send acknowledgment back to sender
+    ws_manager.send_bytes_personal(encode_ack(success, topic), websocket)
+
+
+async def handle_ping(message: ClientMessage, websocket: WebSocket, client_id: int):
+    """Respond to a client's ping with pong"""
+    ws_manager.send_bytes_personal(PONG_MESSAGE, websocket)
+
+
+# Client message type -> handler
+MESSAGE_HANDLERS = {
+    'publish': handle_publish,
+    'ping': handle_ping
+}
+
+
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     """
@@ -245,79 +326,53 @@ async def websocket_endpoint(websocket: WebSocket):
     
     try:
         # Send initial connection status
-        await ws_manager.send_personal({
-            'type': 'status',
-            'status': 'connected' if serial_handler.is_connected else 'disconnected',
-            'details': {
+        ws_manager.send_bytes_personal(ws_manager.encode_status(
+            'connected' if serial_handler.is_connected else 'disconnected',
+            {
                 'serial_port': config.serial_port,
                 'baudrate': config.baudrate
             }
-        }, websocket)
+        ), websocket)
         
         logger.info(f"Client {client_id} connected successfully")
         
         # Handle incoming messages from this client
         while True:
-            # Receive message from WebSocket client
-            data = await websocket.receive_text()
+            # Receive message from WebSocket client; binary frames are decoded
+            # straight from bytes, text frames are still accepted
+            frame = await websocket.receive()
+            if frame['type'] == 'websocket.disconnect':
+                raise WebSocketDisconnect(frame.get('code', 1000))
+            
+            data = frame.get('bytes')
+            if data is None:
+                data = frame.get('text', '')
             
             try:
-                message = json.loads(data)
-                message_type = message.get('type', 'publish')
-                
-                if message_type == 'publish':
-                    # Forward publish message to Arduino via serial
-                    topic = message.get('topic', '')
-                    payload = message.get('payload', '')
-                    
-                    if topic:
-                        logger.debug(f"Client {client_id} publishing: {topic}:{payload}")
-                        success = await serial_handler.write_message(topic, payload)
-                        
-                        if not success:
-                            logger.warning(f"Failed to write message from client {client_id}")
-                        
-                        # Send acknowledgment back to sender
-                        await ws_manager.send_personal({
-                            'type': 'ack',
-                            'success': success,
-                            'topic': topic
-                        }, websocket)
-                    else:
-                        logger.warning(f"Client {client_id} sent message without topic")
-                        await ws_manager.send_personal({
-                            'type': 'error',
-                            'message': 'Topic is required'
-                        }, websocket)
-                
-                elif message_type == 'ping':
-                    # Respond to ping with pong
-                    await ws_manager.send_personal({
-                        'type': 'pong'
-                    }, websocket)
+                message = client_message_decoder.decode(data)
+                handler = MESSAGE_HANDLERS.get(message.type)
                 
+                if handler:
+                    await handler(message, websocket, client_id)
                 else:
-                    logger.warning(f"Unknown message type from client {client_id}: {message_type}")
+                    logger.warning(f"Unknown message type from client {client_id}: {message.type}")
                 
-            except json.JSONDecodeError as e:
+            except msgspec.ValidationError as e:
+                logger.error(f"Invalid message from client {client_id}: {e}")
+                ws_manager.send_bytes_personal(INVALID_MESSAGE_MESSAGE, websocket)
+            except msgspec.DecodeError:
                 logger.error(f"Invalid JSON from client {client_id}: {data[:100]}")
-                await ws_manager.send_personal({
-                    'type': 'error',
-                    'message': 'Invalid JSON format'
-                }, websocket)
+                ws_manager.send_bytes_personal(INVALID_JSON_MESSAGE, websocket)
             except Exception as e:
                 logger.error(f"Error processing message from client {client_id}: {e}", exc_info=True)
-                await ws_manager.send_personal({
-                    'type': 'error',
-                    'message': 'Internal server error'
-                }, websocket)
+                ws_manager.send_bytes_personal(INTERNAL_ERROR_MESSAGE, websocket)
     
     except WebSocketDisconnect:
         logger.info(f"Client {client_id} disconnected normally")
     except Exception as e:
         logger.error(f"WebSocket error for client {client_id}: {e}", exc_info=True)
     finally:
-        await ws_manager.disconnect(websocket)
+        ws_manager.disconnect(websocket)
         logger.info(f"Client {client_id} cleanup complete")
 
 
@@ -331,16 +386,35 @@ def main():
     
     args = parser.parse_args()
     
-    # Update configuration from arguments
-    config.update_from_args(port=args.port, baudrate=args.baudrate)
+    # Update configuration from arguments (Config is frozen, so derive a copy)
+    global config
+    overrides = {}
+    if args.port:
+        overrides['serial_port'] = args.port
+    if args.baudrate:
+        overrides['baudrate'] = args.baudrate
     if args.host:
-        config.ws_host = args.host
+        overrides['ws_host'] = args.host
     if args.ws_port:
-        config.ws_port = args.ws_port
+        overrides['ws_port'] = args.ws_port
+    config = replace(config, **overrides)
+    
+    # The serial handler was built from the environment config at import time
+    serial_handler.port = config.serial_port
+    serial_handler.baudrate = config.baudrate
     
     # Run the server
     import uvicorn
-    uvicorn.run(app, host=config.ws_host, port=config.ws_port)
+    # "auto" picks uvloop/httptools when installed; uvloop does not support
+    # Windows, where uvicorn keeps the default asyncio event loop
+    uvicorn.run(
+        app,
+        host=config.ws_host,
+        port=config.ws_port,
+        loop="auto",
+        http="auto",
+        ws="websockets"
+    )
 
 
 if __name__ == "__main__":
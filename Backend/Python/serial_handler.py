@@ -4,17 +4,26 @@ Manages serial port communication with Arduino
 """
 import asyncio
 import logging
-from typing import Optional, Dict
+import random
+import sys
+from typing import Optional, Dict, Tuple
 import serial
 import serial_asyncio
 
 logger = logging.getLogger(__name__)
 
+# Bytes requested from the serial reader per read call
+_READ_CHUNK_SIZE = 4096
+# Discard buffered data that grows this large without a newline
+_MAX_LINE_LENGTH = 65536
+
 
 class SerialHandler:
     """Handles serial port communication with Arduino"""
     
-    def __init__(self, port: str, baudrate: int = 9600, timeout: float = 1.0, reconnect_interval: int = 5):
+    def __init__(self, port: str, baudrate: int = 9600, timeout: float = 1.0, reconnect_interval: int = 5,
+                 max_reconnect_interval: float = 60, poll_interval: float = 0.01,
+                 write_timeout: float = 1.0):
         """
         Initialize SerialHandler
         
@@ -22,23 +31,43 @@ class SerialHandler:
             port: Serial port name (e.g., 'COM3' or '/dev/ttyUSB0')
             baudrate: Communication speed (default: 9600)
             timeout: Read timeout in seconds
-            reconnect_interval: Seconds between reconnection attempts
+            reconnect_interval: Base delay in seconds between reconnection attempts
+            max_reconnect_interval: Upper bound in seconds for the backoff delay
+            poll_interval: Seconds between serial read polls (Windows only)
+            write_timeout: Seconds to wait for a write to drain before disconnecting
         """
         self.port = port
         self.baudrate = baudrate
         self.timeout = timeout
         self.reconnect_interval = reconnect_interval
+        self.max_reconnect_interval = max_reconnect_interval
+        self.poll_interval = poll_interval
+        self.write_timeout = write_timeout
         self.serial_connection = None
         self.reader = None
         self.writer = None
-        self.is_connected = False
+        self._rxbuf = bytearray()
+        # Serializes writes so concurrent publishers never interleave frames
+        self._write_lock = asyncio.Lock()
+        # Connection state: connected, disconnecting (neither set) or disconnected
+        self._connected = asyncio.Event()
+        self._disconnected = asyncio.Event()
+        self._disconnected.set()
         self._reconnect_task = None
-        self._should_reconnect = True
+        self._stop_reconnect_event = asyncio.Event()
         self._status_callbacks = []
+        # Immutable snapshot of _status_callbacks, rebuilt after registration
+        self._status_callbacks_snapshot: Optional[Tuple] = None
+    
+    @property
+    def is_connected(self) -> bool:
+        """Whether the serial port is currently connected"""
+        return self._connected.is_set()
+    
         
     async def connect(self) -> bool:
         """
-        Connect to the serial port
+        Connect to the serial port and notify status callbacks on success
         
         Returns:
             True if connection successful, False otherwise
@@ -53,74 +82,172 @@ class SerialHandler:
                 timeout=self.timeout
             )
             
-            self.is_connected = True
+            if sys.platform == 'win32':
+                self._tune_windows_polling()
+            
+            self._rxbuf.clear()
+            self._disconnected.clear()
+            self._connected.set()
             logger.info(f"Successfully connected to {self.port}")
-            return True
             
         except serial.SerialException as e:
             logger.error(f"Failed to connect to {self.port}: {e}")
-            self.is_connected = False
             return False
         except Exception as e:
             logger.error(f"Unexpected error connecting to {self.port}: {e}")
-            self.is_connected = False
             return False
+        
+        await self._notify_status_change(True)
+        return True
+    
+    def _tune_windows_polling(self):
+        """
+        Slow down pyserial-asyncio's read polling on Windows
+        
+        COM handles cannot be registered with the event loop on Windows, so
+        the transport polls the port instead, every 0.5 ms by default. That
+        keeps a CPU core busy while idle; poll_interval trades a little
+        latency for an idle bridge.
+        """
+        transport = self.writer.transport
+        if hasattr(transport, '_poll_wait_time'):
+            transport._poll_wait_time = self.poll_interval
+        else:
+            logger.warning("Serial transport does not support poll interval tuning")
     
     async def disconnect(self):
         """Disconnect from the serial port"""
-        if self.writer:
+        # Detach the streams before awaiting, so a reconnect that happens
+        # while closing is never torn down by this call
+        writer = self.writer
+        self._connected.clear()
+        self.reader = None
+        self.writer = None
+        self._rxbuf.clear()
+        
+        if writer:
             try:
-                self.writer.close()
-                await self.writer.wait_closed()
+                writer.close()
+                await writer.wait_closed()
                 logger.info(f"Disconnected from {self.port}")
             except Exception as e:
                 logger.error(f"Error during disconnect: {e}")
         
-        self.is_connected = False
-        self.reader = None
-        self.writer = None
+        # Only now may the reconnect loop open the port again
+        self._disconnected.set()
+    
+    async def wait_until_connected(self):
+        """Wait until the serial port is connected, without polling"""
+        await self._connected.wait()
     
-    async def read_message(self) -> Optional[Dict[str, str]]:
+    async def read_message(self) -> Dict[str, str]:
         """
-        Read a message from the serial port
+        Read the next valid message from the serial port
+        
+        Suspends until a complete, parseable line arrives. Empty and
+        malformed lines are skipped.
         
         Returns:
-            Dictionary with 'topic' and 'payload' keys, or None if error/no data
+            Dictionary with 'topic' and 'payload' keys
+            
+        Raises:
+            ConnectionError: If the serial port is not connected or the
+                connection was lost while reading
         """
-        if not self.is_connected or not self.reader:
-            return None
+        # Keep the reader this call started with; disconnect() clears self.reader
+        reader = self.reader
+        if reader is None or not self.is_connected:
+            raise ConnectionError("Serial port not connected")
         
-        try:
-            # Read until newline (message boundary)
-            line = await self.reader.readuntil(b'\n')
-            
-            # Decode with error handling for invalid UTF-8
+        read_line = self._read_line
+        parse = self.parse_serial_message
+        
+        while True:
+            # Next newline-terminated line (message boundary)
             try:
-                message_str = line.decode('utf-8').strip()
-            except UnicodeDecodeError as e:
-                # Try with 'replace' to handle invalid bytes
-                message_str = line.decode('utf-8', errors='replace').strip()
-                logger.warning(f"Invalid UTF-8 in serial data (replaced): {line.hex()} -> {message_str}")
-            
-            if not message_str:
-                return None
+                line = await read_line(reader)
+            except (asyncio.IncompleteReadError, serial.SerialException, OSError) as e:
+                # Only tear down the connection this reader belongs to; a
+                # stale reader failing after a reconnect must not drop the new one
+                if reader is self.reader:
+                    await self.handle_disconnect()
+                raise ConnectionError("Serial connection lost while reading") from e
             
             # Parse the message
-            parsed = self.parse_serial_message(message_str)
+            parsed = parse(line)
             if parsed:
-                logger.debug(f"Received: {parsed}")
-            return parsed
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Received: %s", parsed)
+                return parsed
+    
+    def try_parse_buffered(self) -> Optional[Dict[str, str]]:
+        """
+        Parse the next message already in the receive buffer, without reading
+        
+        Lets callers drain a burst of lines that arrived in one read.
+        
+        Returns:
+            Dictionary with 'topic' and 'payload' keys, or None if no complete
+            valid message is buffered
+        """
+        pop_line = self._pop_line
+        parse = self.parse_serial_message
+        
+        while True:
+            line = pop_line()
+            if line is None:
+                return None
             
-        except asyncio.IncompleteReadError:
-            logger.warning("Incomplete read from serial port")
-            return None
-        except serial.SerialException as e:
-            logger.error(f"Serial error while reading: {e}")
-            self.is_connected = False
-            return None
-        except Exception as e:
-            logger.error(f"Error reading message: {e}")
+            parsed = parse(line)
+            if parsed:
+                return parsed
+    
+    def _pop_line(self) -> Optional[bytes]:
+        """
+        Remove the next complete line from the receive buffer
+        
+        Returns:
+            Line without its trailing newline, or None if no complete line is buffered
+        """
+        rxbuf = self._rxbuf
+        newline = rxbuf.find(b'\n')
+        if newline < 0:
             return None
+        
+        line = bytes(rxbuf[:newline])
+        del rxbuf[:newline + 1]
+        return line
+    
+    async def _read_line(self, reader: asyncio.StreamReader) -> bytes:
+        """
+        Read the next complete line, reading from the port in chunks as needed
+        
+        Args:
+            reader: Stream reader of the current serial connection
+            
+        Returns:
+            Line without its trailing newline
+            
+        Raises:
+            asyncio.IncompleteReadError: If the port reached EOF
+        """
+        rxbuf = self._rxbuf
+        pop_line = self._pop_line
+        line = pop_line()
+        
+        while line is None:
+            if len(rxbuf) > _MAX_LINE_LENGTH:
+                logger.warning(f"Discarding {len(rxbuf)} bytes of serial data without newline")
+                rxbuf.clear()
+            
+            data = await reader.read(_READ_CHUNK_SIZE)
+            if not data:
+                raise asyncio.IncompleteReadError(bytes(rxbuf), None)
+            
+            rxbuf.extend(data)
+            line = pop_line()
+        
+        return line
     
     async def write_message(self, topic: str, payload: str) -> bool:
         """
@@ -133,67 +260,84 @@ class SerialHandler:
         Returns:
             True if write successful, False otherwise
         """
-        if not self.is_connected or not self.writer:
-            logger.warning("Cannot write: not connected")
-            return False
-        
-        try:
-            # Format the message
-            message = self.format_serial_message(topic, payload)
-            
-            # Write to serial port
-            self.writer.write(message.encode('utf-8'))
-            await self.writer.drain()
+        async with self._write_lock:
+            writer = self.writer
+            if writer is None or not self.is_connected:
+                logger.warning("Cannot write: not connected")
+                return False
             
-            logger.debug(f"Sent: {topic}:{payload}")
-            return True
-            
-        except serial.SerialException as e:
-            logger.error(f"Serial error while writing: {e}")
-            self.is_connected = False
-            return False
-        except Exception as e:
-            logger.error(f"Error writing message: {e}")
-            return False
+            try:
+                # Format the message
+                message_bytes = self.format_serial_message(topic, payload)
+                
+                # Write to serial port, bounding how long a stalled device can block us
+                writer.write(message_bytes)
+                await asyncio.wait_for(writer.drain(), timeout=self.write_timeout)
+                
+                logger.debug("Sent: %s:%s", topic, payload)
+                return True
+                
+            except asyncio.TimeoutError:
+                logger.error(f"Timed out after {self.write_timeout}s writing to {self.port}")
+                # Discard the stalled write buffer so closing does not wait on it
+                writer.transport.abort()
+            except serial.SerialException as e:
+                logger.error(f"Serial error while writing: {e}")
+            except Exception as e:
+                logger.error(f"Error writing message: {e}")
+                return False
+        
+        # Drain timed out or the port failed: treat the device as gone
+        if writer is self.writer:
+            await self.handle_disconnect()
+        return False
     
     @staticmethod
-    def parse_serial_message(message: str) -> Optional[Dict[str, str]]:
+    def parse_serial_message(message: bytes) -> Optional[Dict[str, str]]:
         """
         Parse a serial message from Arduino format to Python dict
         
         Format: TOPIC:PAYLOAD
         
         Args:
-            message: Raw message string
+            message: Raw message line as received from the serial port
             
         Returns:
-            Dictionary with 'topic' and 'payload', or None if invalid
+            Dictionary with 'topic' and 'payload', or None if invalid or blank
         """
-        if not message:
-            return None
+        # Split on the first colon separator in a single pass
+        head, sep, tail = message.partition(b':')
         
-        # Find the first colon separator
-        colon_index = message.find(':')
-        
-        if colon_index == -1:
-            logger.warning(f"Invalid message format (no colon): {message}")
+        if not sep:
+            if message.strip():
+                logger.warning(f"Invalid message format (no colon): {message!r}")
             return None
         
-        topic = message[:colon_index].strip()
-        payload = message[colon_index + 1:].strip()
+        head = head.strip()
+        tail = tail.strip()
         
         # Validate topic is not empty
-        if not topic:
-            logger.warning(f"Invalid message format (empty topic): {message}")
+        if not head:
+            logger.warning(f"Invalid message format (empty topic): {message!r}")
             return None
         
+        # Decode with error handling for invalid UTF-8
+        try:
+            topic = head.decode('utf-8')
+            payload = tail.decode('utf-8')
+        except UnicodeDecodeError:
+            # Use 'replace' to handle invalid bytes
+            topic = head.decode('utf-8', errors='replace')
+            payload = tail.decode('utf-8', errors='replace')
+            logger.warning(f"Invalid UTF-8 in serial data (replaced): {message.hex()}")
+        
         return {
             'topic': topic,
             'payload': payload
         }
     
     @staticmethod
-    def format_serial_message(topic: str, payload: str) -> str:
+    def format_serial_message(topic: str, payload: str) -> bytes:
         """
         Format a message from Python dict to Arduino serial format
         
@@ -204,9 +348,9 @@ class SerialHandler:
             payload: Message payload
             
         Returns:
-            Formatted message string with newline
+            UTF-8 encoded message with newline, ready to write to the port
         """
-        return f"{topic}:{payload}\n"
+        return f"{topic}:{payload}\n".encode('utf-8')
     
     def add_status_callback(self, callback):
         """
@@ -216,54 +360,109 @@ class SerialHandler:
             callback: Async function to call with status (True/False)
         """
         self._status_callbacks.append(callback)
+        self._status_callbacks_snapshot = None
     
     async def _notify_status_change(self, connected: bool):
-        """Notify all callbacks of status change"""
-        for callback in self._status_callbacks:
-            try:
-                await callback(connected)
-            except Exception as e:
-                logger.error(f"Error in status callback: {e}")
+        """Notify all callbacks of status change, running them concurrently"""
+        callbacks = self._status_callbacks_snapshot
+        if callbacks is None:
+            callbacks = self._status_callbacks_snapshot = tuple(self._status_callbacks)
+        
+        results = await asyncio.gather(
+            *(callback(connected) for callback in callbacks),
+            return_exceptions=True
+        )
+        
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error(f"Error in status callback: {result}")
     
     async def start_reconnect_loop(self):
         """
         Start the automatic reconnection loop
-        Runs in background and attempts to reconnect every reconnect_interval seconds
+        Runs in background and retries with exponential backoff and full jitter
         """
-        self._should_reconnect = True
+        self._stop_reconnect_event.clear()
         self._reconnect_task = asyncio.create_task(self._reconnect_loop())
         logger.info("Reconnection loop started")
     
     async def stop_reconnect_loop(self):
         """Stop the automatic reconnection loop"""
-        self._should_reconnect = False
+        # Wake the loop immediately instead of waiting out the current delay
+        self._stop_reconnect_event.set()
         if self._reconnect_task:
-            self._reconnect_task.cancel()
             try:
                 await self._reconnect_task
             except asyncio.CancelledError:
                 pass
         logger.info("Reconnection loop stopped")
     
+    def _backoff_delay(self, attempt: int) -> float:
+        """
+        Compute the delay before the next reconnection attempt ("full jitter")
+        
+        Args:
+            attempt: Number of consecutive failed attempts so far
+            
+        Returns:
+            Random delay in seconds between 0 and the capped exponential backoff
+        """
+        ceiling = min(self.max_reconnect_interval, self.reconnect_interval * 2 ** attempt)
+        return random.uniform(0, ceiling)
+    
+    @staticmethod
+    async def _wait_for_any(*events: asyncio.Event):
+        """
+        Wait until at least one of the given events is set
+        
+        Args:
+            events: Events to wait on
+        """
+        waiters = [asyncio.create_task(event.wait()) for event in events]
+        try:
+            await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for waiter in waiters:
+                waiter.cancel()
+    
     async def _reconnect_loop(self):
         """Background task that continuously attempts to reconnect"""
-        while self._should_reconnect:
-            if not self.is_connected:
-                logger.info(f"Attempting to reconnect to {self.port}...")
-                success = await self.connect()
-                
-                if success:
-                    await self._notify_status_change(True)
-                else:
-                    logger.warning(f"Reconnection failed, will retry in {self.reconnect_interval} seconds")
+        attempt = 0
+        
+        while not self._stop_reconnect_event.is_set():
+            if self.is_connected:
+                # Sleep until the connection drops or the loop is stopped
+                await self._wait_for_any(self._disconnected, self._stop_reconnect_event)
+                continue
+            
+            logger.info(f"Attempting to reconnect to {self.port}...")
+            if await self.connect():
+                attempt = 0
+                continue
+            
+            delay = self._backoff_delay(attempt)
+            # Stop growing once the ceiling is reached
+            if self.reconnect_interval * 2 ** attempt < self.max_reconnect_interval:
+                attempt += 1
+            logger.warning(f"Reconnection failed, will retry in {delay:.1f} seconds")
             
-            # Wait before next attempt
-            await asyncio.sleep(self.reconnect_interval)
+            # Wait before next attempt, waking early if the loop is stopped
+            try:
+                await asyncio.wait_for(self._stop_reconnect_event.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
     
     async def handle_disconnect(self):
-        """Handle unexpected disconnection"""
-        if self.is_connected:
-            logger.warning(f"Connection to {self.port} lost")
-            self.is_connected = False
-            await self._notify_status_change(False)
-            await self.disconnect()
+        """
+        Handle unexpected disconnection
+        
+        The state flips before any await, so concurrent callers (the serial
+        task, writers, the reconnect loop) tear the connection down only once.
+        """
+        if not self.is_connected:
+            return
+        
+        logger.warning(f"Connection to {self.port} lost")
+        self._connected.clear()
+        await self._notify_status_change(False)
+        await self.disconnect()
@@ -4,9 +4,10 @@ Manages WebSocket client connections and message broadcasting
 """
 import asyncio
 import logging
-from typing import List, Dict, Any
+from typing import Set, Dict, List, Tuple, Any
 from fastapi import WebSocket
-import json
+
+from json_codec import dumps
 
 logger = logging.getLogger(__name__)
 
@@ -14,15 +15,24 @@ logger = logging.getLogger(__name__)
 class WebSocketManager:
     """Manages WebSocket client connections"""
     
-    def __init__(self, max_connections: int = 100):
+    def __init__(self, max_connections: int = 100, queue_size: int = 64):
         """
         Initialize WebSocketManager
         
         Args:
             max_connections: Maximum number of concurrent connections
+            queue_size: Maximum number of pending outbound messages per client;
+                a client that falls further behind is disconnected
         """
-        self.active_connections: List[WebSocket] = []
+        self.active_connections: Set[WebSocket] = set()
         self.max_connections = max_connections
+        self.queue_size = queue_size
+        # Per-client outbound queue and the task draining it to the socket
+        self._senders: Dict[WebSocket, Tuple[asyncio.Queue, asyncio.Task]] = {}
+        # Encoded status messages keyed by (status, details items)
+        self._status_cache: Dict[Tuple, bytes] = {}
+        # Pending close tasks for clients dropped for falling behind
+        self._close_tasks: Set[asyncio.Task] = set()
         
     async def connect(self, websocket: WebSocket) -> bool:
         """
@@ -39,51 +49,142 @@ class WebSocketManager:
             return False
         
         await websocket.accept()
-        self.active_connections.append(websocket)
+        self.active_connections.add(websocket)
+        
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        task = asyncio.create_task(self._sender(websocket, queue))
+        self._senders[websocket] = (queue, task)
+        
         logger.info(f"Client connected. Total connections: {len(self.active_connections)}")
         return True
     
-    async def disconnect(self, websocket: WebSocket):
+    def disconnect(self, websocket: WebSocket):
         """
         Remove a WebSocket connection
         
+        Safe to call more than once for the same connection.
+        
         Args:
             websocket: WebSocket connection to remove
         """
-        if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
+        self.active_connections.discard(websocket)
+        
+        sender = self._senders.pop(websocket, None)
+        if sender:
+            _, task = sender
+            # The sender task may be the one disconnecting its own client
+            if task is not asyncio.current_task():
+                task.cancel()
             logger.info(f"Client disconnected. Total connections: {len(self.active_connections)}")
     
+    async def _sender(self, websocket: WebSocket, queue: asyncio.Queue):
+        """
+        Drain a client's outbound queue to its socket
+        
+        Args:
+            websocket: Target WebSocket connection
+            queue: Queue of encoded messages for this client
+        """
+        while True:
+            message_bytes = await queue.get()
+            try:
+                await websocket.send_bytes(message_bytes)
+            except Exception as e:
+                logger.error(f"Error sending to client: {e}")
+                # Remove if connection is broken
+                self.disconnect(websocket)
+                return
+    
+    def _enqueue(self, websocket: WebSocket, message_bytes: bytes):
+        """
+        Queue an encoded message for a client without waiting
+        
+        If the client's queue is full, the client has stopped keeping up and
+        is disconnected rather than silently losing messages (such as status
+        updates); it gets a fresh status when it reconnects.
+        
+        Args:
+            websocket: Target WebSocket connection
+            message_bytes: Encoded message to send
+        """
+        sender = self._senders.get(websocket)
+        if not sender:
+            return
+        
+        queue, _ = sender
+        try:
+            queue.put_nowait(message_bytes)
+        except asyncio.QueueFull:
+            logger.warning(f"Client {id(websocket)} is not keeping up "
+                           f"({self.queue_size} messages queued), disconnecting")
+            self.disconnect(websocket)
+            
+            task = asyncio.create_task(self._close_slow_client(websocket))
+            self._close_tasks.add(task)
+            task.add_done_callback(self._close_tasks.discard)
+    
+    async def _close_slow_client(self, websocket: WebSocket):
+        """
+        Close the socket of a client that was dropped for falling behind
+        
+        Args:
+            websocket: WebSocket connection to close
+        """
+        try:
+            await websocket.close(code=1013, reason="Client too slow")
+        except Exception as e:
+            logger.debug("Error closing slow client %s: %s", id(websocket), e)
+    
     async def broadcast(self, message: Dict[str, Any]):
         """
         Broadcast a message to all connected clients
         
+        Messages are queued per client, so a slow client never delays the
+        caller or the other clients.
+        
         Args:
             message: Dictionary to send as JSON
         """
-        if not self.active_connections:
+        if not self._senders:
             return
         
-        # Convert message to JSON string
+        # Serialize once; every client is sent the same encoded buffer
         try:
-            message_json = json.dumps(message)
+            message_bytes = dumps(message)
         except Exception as e:
             logger.error(f"Error serializing message: {e}")
             return
         
-        # Send to all clients, removing disconnected ones
-        disconnected = []
+        self._broadcast_bytes(message_bytes)
+    
+    def _broadcast_bytes(self, message_bytes: bytes):
+        """
+        Queue an already encoded message for all connected clients
         
-        for connection in self.active_connections:
-            try:
-                await connection.send_text(message_json)
-            except Exception as e:
-                logger.error(f"Error sending to client: {e}")
-                disconnected.append(connection)
+        Args:
+            message_bytes: UTF-8 encoded JSON message
+        """
+        # Snapshot, since a client that overflows is removed while iterating
+        for websocket in tuple(self._senders):
+            self._enqueue(websocket, message_bytes)
+    
+    async def broadcast_batch(self, messages: List[Dict[str, Any]]):
+        """
+        Broadcast several messages to all clients as a single frame
+        
+        More than one message is wrapped as {'type': 'batch', 'messages': [...]},
+        so the burst is encoded once and sent as one frame per client.
         
-        # Clean up disconnected clients
-        for connection in disconnected:
-            await self.disconnect(connection)
+        Args:
+            messages: Dictionaries to send as JSON
+        """
+        if len(messages) == 1:
+            await self.broadcast(messages[0])
+        elif messages:
+            await self.broadcast({
+                'type': 'batch',
+                'messages': messages
+            })
     
     async def send_personal(self, message: Dict[str, Any], websocket: WebSocket):
         """
@@ -94,12 +195,22 @@ class WebSocketManager:
             websocket: Target WebSocket connection
         """
         try:
-            message_json = json.dumps(message)
-            await websocket.send_text(message_json)
+            message_bytes = dumps(message)
         except Exception as e:
-            logger.error(f"Error sending personal message: {e}")
-            # Remove if connection is broken
-            await self.disconnect(websocket)
+            logger.error(f"Error serializing personal message: {e}")
+            return
+        
+        self.send_bytes_personal(message_bytes, websocket)
+    
+    def send_bytes_personal(self, message_bytes: bytes, websocket: WebSocket):
+        """
+        Send an already encoded JSON message to a specific client
+        
+        Args:
+            message_bytes: UTF-8 encoded JSON message
+            websocket: Target WebSocket connection
+        """
+        self._enqueue(websocket, message_bytes)
     
     def get_connection_count(self) -> int:
         """
@@ -118,9 +229,41 @@ class WebSocketManager:
             status: Status string (e.g., 'connected', 'disconnected')
             details: Optional additional details
         """
-        message = {
+        if not self._senders:
+            return
+        
+        self._broadcast_bytes(self.encode_status(status, details))
+    
+    def encode_status(self, status: str, details: Dict[str, Any] = None) -> bytes:
+        """
+        Encode a status message, reusing the bytes for repeated statuses
+        
+        Status details only change with the configuration, so a handful of
+        entries covers every status sent while the server runs.
+        
+        Args:
+            status: Status string (e.g., 'connected', 'disconnected')
+            details: Optional additional details (values must be hashable to be cached)
+            
+        Returns:
+            UTF-8 encoded JSON status message
+        """
+        details = details or {}
+        key = (status, tuple(details.items()))
+        
+        try:
+            return self._status_cache[key]
+        except KeyError:
+            pass
+        except TypeError:
+            # Unhashable detail values: encode without caching
+            key = None
+        
+        message_bytes = dumps({
             'type': 'status',
             'status': status,
-            'details': details or {}
-        }
-        await self.broadcast(message)
+            'details': details
+        })
+        if key is not None:
+            self._status_cache[key] = message_bytes
+        return message_bytes
@@ -15,6 +15,8 @@ class PubSubClient {
         this.reconnectAttempts = 0;
         this.maxReconnectDelay = 30000; // 30 seconds
         this.baseReconnectDelay = 1000; // 1 second
+        this.textDecoder = new TextDecoder('utf-8');
+        this.textEncoder = new TextEncoder();
     }
 
     /**
@@ -28,6 +30,8 @@ class PubSubClient {
 
         console.log(`Connecting to ${this.wsUrl}...`);
         this.ws = new WebSocket(this.wsUrl);
+        // Server broadcasts arrive as binary (UTF-8 JSON) frames
+        this.ws.binaryType = 'arraybuffer';
 
         this.ws.onopen = () => {
             console.log('WebSocket connected');
@@ -38,7 +42,10 @@ class PubSubClient {
 
         this.ws.onmessage = (event) => {
             try {
-                const message = JSON.parse(event.data);
+                const data = typeof event.data === 'string'
+                    ? event.data
+                    : this.textDecoder.decode(event.data);
+                const message = JSON.parse(data);
                 this._handleMessage(message);
             } catch (error) {
                 console.error('Failed to parse message:', error);
@@ -122,7 +129,8 @@ class PubSubClient {
         };
 
         try {
-            this.ws.send(JSON.stringify(message));
+            // Send as a binary (UTF-8 JSON) frame
+            this.ws.send(this.textEncoder.encode(JSON.stringify(message)));
             console.log(`Published to ${topic}:`, payload);
 
             // 通知全局消息处理器（用于调试面板显示发送的消息）
@@ -176,6 +184,12 @@ class PubSubClient {
      * @private
      */
     _handleMessage(message) {
+        // Unpack bursts of messages the server sent in a single frame
+        if (message.type === 'batch') {
+            (message.messages || []).forEach(item => this._handleMessage(item));
+            return;
+        }
+
         // Handle status messages
         if (message.type === 'status') {
             const isConnected = message.status === 'connected';